@@ -14,23 +14,141 @@ Prioritäten:
 4. CO₂-Minimierung
 """
 
+import hashlib
 import json
 import logging
 import os
 import re
-import shutil
+import time
+from collections.abc import Iterable
 from datetime import datetime, timedelta
+from typing import NamedTuple
 
 import voluptuous as vol
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, State, callback
 from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.debounce import Debouncer
 from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DEFAULT_CONFIG, DOMAIN
+from .const import DEFAULT_CONFIG, DOMAIN, EnergyManagerConfig, SystemState
 
 _LOGGER = logging.getLogger(__name__)
 
+# Cooldown des Refresh-Debouncers für ereignisgesteuerte Durchläufe (Sekunden)
+_REFRESH_COOLDOWN_S = 30
+
+# Eingänge der Entscheidungsregeln, deren Schwellenübergänge einen Durchlauf auslösen
+# (current_price hat mit _on_price_change einen eigenen Listener)
+_TRIGGER_ENTITY_KEYS = ("pv_power", "house_consumption", "battery_soc", "car_soc", "car_connected")
+
+# Titel aller Push-Benachrichtigungen
+_NOTIFY_TITLE = "Energiemanager"
+
+# Mindestabstand zwischen zwei gleichen Benachrichtigungen (Sekunden)
+_NOTIFY_COOLDOWN_S = 2 * 60 * 60
+
+# Mindeständerung des Strompreises für eine sofortige Neuberechnung (€/kWh)
+_PRICE_CHANGE_THRESHOLD_EUR = 0.02
+
+# Script-Tags im Dashboard-HTML, an die der Cache-Buster (?v=…) angehängt wird
+# (auf Bytes, damit das HTML ohne Dekodieren/Enkodieren durchgereicht wird)
+_SCRIPT_SRC_RE = re.compile(rb'(src="[^"]+\.js)(?:\?v=\d+)?"')
+
+# Numerische Felder des Systemzustands: (Feld, Entitäts-Schlüssel, Divisor, Nachkommastellen).
+# Die Rundung unterdrückt Sensorrauschen, damit unveränderte Zustände als gleich erkannt werden.
+_SNAPSHOT_SPEC = (
+    # PV
+    ("pv_power_kw", "pv_power", 1000, 2),
+    ("pv_forecast_today_kwh", "pv_forecast_today", 1, 2),
+    ("pv_forecast_remaining_kwh", "pv_forecast_remaining", 1, 2),
+    ("pv_forecast_tomorrow_kwh", "pv_forecast_tomorrow", 1, 2),
+    ("pv_forecast_next_hour_kwh", "pv_forecast_next_hour", 1, 2),
+    ("pv_forecast_d3_kwh", "pv_forecast_d3", 1, 2),
+    ("pv_forecast_d4_kwh", "pv_forecast_d4", 1, 2),
+    ("pv_forecast_d5_kwh", "pv_forecast_d5", 1, 2),
+    ("pv_forecast_d6_kwh", "pv_forecast_d6", 1, 2),
+    ("pv_forecast_d7_kwh", "pv_forecast_d7", 1, 2),
+    # Hausakku
+    ("battery_soc", "battery_soc", 1, 1),
+    ("battery_power_kw", "battery_power", 1000, 2),
+    # Elektroauto
+    ("car_soc", "car_soc", 1, 1),
+    ("car_charging_power_kw", "car_charging_power", 1000, 2),
+    # Netz & Verbrauch
+    ("grid_power_kw", "grid_power", 1000, 2),
+    ("house_consumption_kw", "house_consumption", 1000, 2),
+    # Preise
+    ("current_price_eur", "current_price", 1, 4),
+)
+
+# Teilmenge von _SNAPSHOT_SPEC, die _input_band für die Regelschwellen braucht
+_BAND_SPEC = tuple(
+    row for row in _SNAPSHOT_SPEC if row[0] in ("pv_power_kw", "house_consumption_kw", "battery_soc", "car_soc")
+)
+
+# Zustandswerte für _safe_float / _safe_bool (Hash-Lookup statt Tupel-Scan)
+_UNAVAILABLE = frozenset({None, "unavailable", "unknown"})
+_TRUTHY = frozenset({"on", "true", "1", "home"})  # Vergleich auf lowercase-Wert
+
+
+class Decision(NamedTuple):
+    """Eine Empfehlung des Entscheidungsalgorithmus (in Prioritätsreihenfolge über die Töpfe emergency/prio1/prio2 ausgegeben)."""
+
+    priority: int
+    action: str
+    reason: str
+    details: tuple[str, tuple] | None  # (Vorlage, Argumente) – erst beim Versand formatiert
+    notify: bool
+
+
+class RuleConditions(NamedTuple):
+    """
+    Teilbedingungen der Auto-/Speicher-/PV-Regeln (ohne Preis).
+    Einzige Quelle für _make_decisions, _state_key und _input_band.
+    """
+
+    car_connected: bool
+    car_needs_charge: bool  # Auto-SOC unter Ziel (unabhängig von car_connected)
+    car_critical: bool  # Auto-SOC unter Mindest-SOC
+    battery_has_room: bool
+    battery_above_reserve: bool
+    pv_enough_for_car: bool
+    pv_enough_for_battery: bool
+    pv_weak: bool  # PV unter 20 % der Peakleistung
+
+
+def _safe_float(state: State | None, default: float = 0.0) -> float:
+    """Liest einen HA-Zustand als float (sicher, auch bei unavailable)."""
+    if state is None:
+        return default
+    val = state.state
+    if val in _UNAVAILABLE:
+        return default
+    try:
+        return float(val)
+    except (ValueError, TypeError):
+        return default
+
+
+def _safe_bool(state: State | None) -> bool:
+    """Liest einen HA-Zustand als bool."""
+    if state is None:
+        return False
+    return state.state.lower() in _TRUTHY
+
+
+def _read_snapshot(states: dict[str, State | None], spec: tuple) -> dict[str, float]:
+    """Rechnet Zustände nach (Feld, Entitäts-Schlüssel, Divisor, Nachkommastellen) um."""
+    return {field: round(_safe_float(states[key]) / div, digits) for field, key, div, digits in spec}
+
+
+def _pv_surplus_kw(snap: dict[str, float]) -> float:
+    """PV-Überschuss aus umgerechneten Werten (positiv = Überschuss verfügbar)."""
+    return round(snap["pv_power_kw"] - snap["house_consumption_kw"], 2)
+
+
 # ─────────────────────────────────────────────
 # CONFIG SCHEMA (voluptuous)
 # ─────────────────────────────────────────────
@@ -105,13 +223,30 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 
     # Entity-Defaults mit User-Konfiguration zusammenführen
     entities = {**DEFAULT_CONFIG["entities"], **user_cfg.get("entities", {})}
-    cfg = {**DEFAULT_CONFIG, **user_cfg, "entities": entities}
+    cfg = EnergyManagerConfig.from_dict({**user_cfg, "entities": entities})
+
+    # Einen evtl. noch vorhandenen Koordinator abbauen, statt ihn samt seiner
+    # State-Listener einfach zu überschreiben
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (previous := domain_data.pop("coordinator", None)) is not None:
+        await previous.async_teardown()
 
     coordinator = EnergyManagerCoordinator(hass, cfg)
     await coordinator.async_setup()
-    await coordinator.async_refresh()
+    domain_data["coordinator"] = coordinator
 
-    hass.data[DOMAIN] = coordinator
+    async def _async_on_stop(_event: Event) -> None:
+        if domain_data.get("coordinator") is coordinator:
+            del domain_data["coordinator"]
+        await coordinator.async_teardown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_on_stop)
+
+    # Erster Durchlauf im Hintergrund – es gibt keine Plattformen, die beim Setup
+    # schon Daten brauchen, also muss der HA-Start nicht auf die Sensorabfrage warten
+    hass.async_create_background_task(
+        coordinator.async_refresh(), name="energy_manager_first_refresh"
+    )
     return True
 
 
@@ -123,25 +258,56 @@ async def async_setup(hass: HomeAssistant, config: dict) -> bool:
 class EnergyManagerCoordinator(DataUpdateCoordinator):
     """Koordinator: verwaltet regelmäßige Updates und Preisänderungs-Listener."""
 
-    def __init__(self, hass: HomeAssistant, cfg: dict):
-        interval_minutes = cfg.get("check_interval_minutes", DEFAULT_CONFIG["check_interval_minutes"])
+    def __init__(self, hass: HomeAssistant, cfg: EnergyManagerConfig):
         super().__init__(
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(minutes=interval_minutes),
+            update_interval=timedelta(minutes=cfg.check_interval_minutes),
+            # Listener nur benachrichtigen, wenn sich der (gerundete) Systemzustand geändert hat
+            always_update=False,
+            # Preis- und Sensor-Trigger über einen Debouncer bündeln: erster Trigger sofort,
+            # weitere innerhalb des Cooldowns ergeben genau einen Folgedurchlauf
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=_REFRESH_COOLDOWN_S, immediate=True
+            ),
         )
         self._cfg = cfg
-        self._entities = cfg["entities"]
-        self._last_notification: dict[str, datetime] = {}
+        self._entities = cfg.entities
+
+        # Statische Schwellenwerte einmalig auflösen (Config ändert sich zur Laufzeit nicht)
+        self._cheap = cfg.price_cheap_threshold
+        self._very_cheap = cfg.price_very_cheap_threshold
+        self._expensive = cfg.price_expensive_threshold
+        self._pv_good_threshold_kw = cfg.pv_peak_power_kw * 0.2
+        self._car_target_soc = cfg.car_default_target_soc
+        self._car_min_soc = cfg.car_min_soc_target
+        self._battery_max_soc = cfg.battery_max_soc
+        self._battery_reserve_soc = cfg.battery_reserve_evening
+        self._pv_surplus_car_kw = cfg.pv_surplus_for_car_charging
+        self._pv_surplus_battery_kw = cfg.pv_surplus_for_battery
+
+        # notify_service einmalig in Domain + Service zerlegen ("notify.mobile_app_x")
+        domain, _, service = cfg.notify_service.partition(".")
+        self._notify_domain = domain
+        self._notify_service = service or domain
+
+        self._last_notification: dict[str, float] = {}  # action → time.monotonic()
+        self._last_state_key: tuple | None = None
+        # Ablauf (monotonic) des Schlüssels, sobald eine aktive Benachrichtigung erneut fällig wird
+        self._state_key_expires: float | None = None
+        self._last_input_band: RuleConditions | None = None
+        self._last_price_processed: float | None = None
         self._unsub_listeners: list = []
 
     async def async_setup(self):
         """Dashboard deployen und Preislistener registrieren."""
         _LOGGER.info("Energy Manager wird initialisiert")
 
-        # Dashboard-Deploy in Thread-Pool (blocking I/O)
-        await self.hass.async_add_executor_job(self._deploy_dashboard)
+        # Dashboard-Deploy im Hintergrund – rein kosmetisch, das Setup wartet nicht darauf
+        self.hass.async_create_background_task(
+            self._async_deploy_dashboard(), name="energy_manager_deploy_dashboard"
+        )
 
         # Preisänderungs-Listener registrieren
         price_entity = self._entities["current_price"]
@@ -152,28 +318,54 @@ class EnergyManagerCoordinator(DataUpdateCoordinator):
         )
         self._unsub_listeners.append(unsub)
 
+        # Schwellenübergänge der entscheidungsrelevanten Eingänge lösen einen (gebündelten) Durchlauf aus
+        self._last_input_band = self._input_band()
+        unsub = async_track_state_change_event(
+            self.hass,
+            [self._entities[key] for key in _TRIGGER_ENTITY_KEYS],
+            self._on_sensor_change,
+        )
+        self._unsub_listeners.append(unsub)
+
         _LOGGER.info(
             "Energy Manager initialisiert – Intervall: %d Minuten",
-            self._cfg.get("check_interval_minutes", DEFAULT_CONFIG["check_interval_minutes"]),
+            self._cfg.check_interval_minutes,
         )
 
     async def async_teardown(self):
-        """Listener aufräumen."""
+        """Listener aufräumen und ausstehende Refreshes verwerfen."""
         for unsub in self._unsub_listeners:
             unsub()
         self._unsub_listeners.clear()
+        await self.async_shutdown()
 
     async def _async_update_data(self):
         """Pflichtmethode: Systemzustand lesen → Entscheidungen → ausführen."""
-        _LOGGER.info("Energiemanager-Durchlauf startet...")
+        _LOGGER.debug("Energiemanager-Durchlauf startet...")
 
-        system = self._get_system_state()
+        now = datetime.now()
+        system = self._get_system_state(now)
         if system is None:
             raise UpdateFailed("Konnte Systemzustand nicht lesen")
 
+        self._last_price_processed = system.current_price_eur
         self._log_system_state(system)
+
+        # Alle Regelbedingungen unverändert → Entscheidungen wären identisch, Durchlauf überspringen
+        # (außer eine anhaltende Benachrichtigung ist nach Ablauf des Cooldowns wieder fällig)
+        state_key = self._state_key(system)
+        if state_key == self._last_state_key and (
+            self._state_key_expires is None or time.monotonic() < self._state_key_expires
+        ):
+            _LOGGER.debug("Regelbedingungen unverändert, überspringe Entscheidungen")
+            return system
+
         decisions = self._make_decisions(system)
-        await self._execute_decisions(decisions, system)
+        # Schlüssel erst nach erfolgreicher Ausführung merken – sonst würde ein
+        # fehlgeschlagener Versand nie nachgeholt
+        if await self._execute_decisions(decisions, system):
+            self._last_state_key = state_key
+            self._state_key_expires = self._next_reminder_due(decisions)
 
         return system
 
@@ -181,295 +373,327 @@ class EnergyManagerCoordinator(DataUpdateCoordinator):
     # SYSTEMZUSTAND LESEN
     # ─────────────────────────────────────────────
 
-    def _get_system_state(self) -> dict | None:
+    def _get_system_state(self, now: datetime) -> SystemState | None:
         """Liest alle relevanten Sensordaten aus Home Assistant."""
         try:
-            e = self._entities
+            hour = now.hour
+
+            # Alle Entitäten einmalig pro Durchlauf aus der State Machine holen
+            st = self._read_states()
 
-            pv_power_w = self._safe_float(e["pv_power"])
-            house_consumption_w = self._safe_float(e["house_consumption"])
-            grid_power_w = self._safe_float(e["grid_power"])
+            # Numerische Sensoren datengetrieben einlesen (W → kW per Divisor)
+            snap = _read_snapshot(st, _SNAPSHOT_SPEC)
 
             # PV-Überschuss berechnen (positiv = Überschuss verfügbar)
-            pv_surplus_w = pv_power_w - house_consumption_w
-
-            current_price_eur = self._safe_float(e["current_price"])
-            price_level = self._compute_price_level(current_price_eur)
-
-            return {
-                # PV
-                "pv_power_kw": pv_power_w / 1000,
-                "pv_surplus_kw": pv_surplus_w / 1000,
-                "pv_forecast_today_kwh": self._safe_float(e["pv_forecast_today"]),
-                "pv_forecast_remaining_kwh": self._safe_float(e["pv_forecast_remaining"]),
-                "pv_forecast_tomorrow_kwh": self._safe_float(e["pv_forecast_tomorrow"]),
-                "pv_forecast_next_hour_kwh": self._safe_float(e["pv_forecast_next_hour"]),
-                "pv_forecast_d3_kwh": self._safe_float(e["pv_forecast_d3"]),
-                "pv_forecast_d4_kwh": self._safe_float(e["pv_forecast_d4"]),
-                "pv_forecast_d5_kwh": self._safe_float(e["pv_forecast_d5"]),
-                "pv_forecast_d6_kwh": self._safe_float(e["pv_forecast_d6"]),
-                "pv_forecast_d7_kwh": self._safe_float(e["pv_forecast_d7"]),
-                # Hausakku
-                "battery_soc": self._safe_float(e["battery_soc"]),
-                "battery_power_kw": self._safe_float(e["battery_power"]) / 1000,
-                # Elektroauto
-                "car_soc": self._safe_float(e["car_soc"]),
-                "car_connected": self._safe_bool(e["car_connected"]),
-                "car_charging_power_kw": self._safe_float(e["car_charging_power"]) / 1000,
-                # Netz & Verbrauch
-                "grid_power_kw": grid_power_w / 1000,
-                "house_consumption_kw": house_consumption_w / 1000,
-                # Preise
-                "current_price_eur": current_price_eur,
-                "price_level": price_level,
-                # Zeit
-                "hour": datetime.now().hour,
-                "is_night": datetime.now().hour < 6 or datetime.now().hour >= 22,
-                "is_morning": 6 <= datetime.now().hour < 10,
-            }
+            snap["pv_surplus_kw"] = _pv_surplus_kw(snap)
+            snap["car_connected"] = _safe_bool(st["car_connected"])
+            snap["price_level"] = self._compute_price_level(snap["current_price_eur"])
+
+            # Zeit
+            snap["hour"] = hour
+            snap["is_night"] = hour < 6 or hour >= 22
+            snap["is_morning"] = 6 <= hour < 10
+            return SystemState(**snap)
         except Exception as ex:
             _LOGGER.error("Fehler beim Lesen des Systemzustands: %s", ex)
             return None
 
+    def _read_states(self, keys: Iterable[str] | None = None) -> dict[str, State | None]:
+        """Holt die konfigurierten Entitäten (alle oder nur keys) in einem Durchgang (Schlüssel → State)."""
+        get_state = self.hass.states.get
+        entities = self._entities
+        if keys is None:
+            keys = entities
+        return {key: get_state(entities[key]) for key in keys}
+
     # ─────────────────────────────────────────────
     # ENTSCHEIDUNGSALGORITHMUS
     # ─────────────────────────────────────────────
 
-    def _make_decisions(self, s: dict) -> list[dict]:
+    def _make_decisions(self, s: SystemState) -> list[Decision]:
         """
         Kernalgorithmus: Trifft Entscheidungen nach Priorität.
         Gibt eine Liste von Entscheidungen zurück.
         """
-        decisions = []
-        cfg = self._cfg
-        price = s["current_price_eur"]
-        cheap = cfg.get("price_cheap_threshold", DEFAULT_CONFIG["price_cheap_threshold"])
-        very_cheap = cfg.get("price_very_cheap_threshold", DEFAULT_CONFIG["price_very_cheap_threshold"])
-        expensive = cfg.get("price_expensive_threshold", DEFAULT_CONFIG["price_expensive_threshold"])
+        # Ein Topf je Priorität – die Reihenfolge ergibt sich beim Zusammenfügen,
+        # ein Sortieren ist nicht nötig
+        emergency: list[Decision] = []
+        prio1: list[Decision] = []
+        prio2: list[Decision] = []
+
+        # Mehrfach gelesene Felder einmal in lokale Variablen übernehmen
+        price = s.current_price_eur
+        car_soc = s.car_soc
+        battery_soc = s.battery_soc
+        pv_surplus_kw = s.pv_surplus_kw
+
+        # Teilbedingungen aus derselben Quelle wie _state_key/_input_band –
+        # neue oder geänderte Schwellen gehören in _input_conditions/_price_conditions
+        c = self._input_conditions(s.car_connected, car_soc, battery_soc, s.pv_power_kw, pv_surplus_kw)
+        price_very_cheap, price_cheap, price_expensive = self._price_conditions(price)
 
         # ──────────────────────────────
-        # PRIORITÄT 1: AUTARKIE / PV-Nutzung
+        # AUTO (nur wenn verbunden) bzw. SPEICHER
         # ──────────────────────────────
 
-        # Auto laden mit PV-Überschuss?
-        if (
-            s["car_connected"]
-            and s["car_soc"] < cfg.get("car_default_target_soc", DEFAULT_CONFIG["car_default_target_soc"])
-            and s["pv_surplus_kw"] >= cfg.get("pv_surplus_for_car_charging", DEFAULT_CONFIG["pv_surplus_for_car_charging"])
-        ):
-            decisions.append(
-                {
-                    "action": "car_charge_pv",
-                    "priority": 1,
-                    "reason": "PV-Überschuss",
-                    "details": (
-                        f"PV-Überschuss: {s['pv_surplus_kw']:.1f} kW verfügbar.\n"
-                        f"Auto-Akku: {s['car_soc']:.0f}% → Laden empfohlen!"
-                    ),
-                    "notify": True,
-                }
-            )
-
-        # Akku laden mit PV-Überschuss (wenn noch nicht voll)?
-        if (
-            s["pv_surplus_kw"] >= cfg.get("pv_surplus_for_battery", DEFAULT_CONFIG["pv_surplus_for_battery"])
-            and s["battery_soc"] < cfg.get("battery_max_soc", DEFAULT_CONFIG["battery_max_soc"])
-            and not s["car_connected"]  # Auto hat Vorrang
-        ):
-            decisions.append(
-                {
-                    "action": "battery_charge_pv",
-                    "priority": 1,
-                    "reason": "PV-Überschuss für Speicher",
-                    "details": None,  # Stille Aktion, kein Notify nötig
-                    "notify": False,
-                }
-            )
-
-        # ──────────────────────────────
-        # PRIORITÄT 2: KOSTENMINIMIERUNG
-        # ──────────────────────────────
-
-        # Speicher aus Netz laden wenn Strom sehr günstig?
-        if (
-            price <= very_cheap
-            and s["battery_soc"] < cfg.get("battery_max_soc", DEFAULT_CONFIG["battery_max_soc"])
-            and not self._is_pv_producing_well(s)
-        ):
-            decisions.append(
-                {
-                    "action": "battery_charge_grid",
-                    "priority": 2,
-                    "reason": "Sehr günstiger Netzstrom",
-                    "details": (
-                        f"Strompreis sehr günstig: {price:.3f} €/kWh\n"
-                        f"Speicher ({s['battery_soc']:.0f}%) aus dem Netz laden empfohlen!"
-                    ),
-                    "notify": True,
-                }
-            )
-
-        # Auto laden weil Strom günstig (auch ohne PV)?
-        if (
-            s["car_connected"]
-            and s["car_soc"] < cfg.get("car_default_target_soc", DEFAULT_CONFIG["car_default_target_soc"])
-            and price <= cheap
-            and s["pv_surplus_kw"] < cfg.get("pv_surplus_for_car_charging", DEFAULT_CONFIG["pv_surplus_for_car_charging"])
-        ):
-            decisions.append(
-                {
-                    "action": "car_charge_cheap",
-                    "priority": 2,
-                    "reason": "Günstiger Netzstrom",
-                    "details": (
-                        f"Günstiger Strom: {price:.3f} €/kWh\n"
-                        f"Auto-Akku: {s['car_soc']:.0f}% → Jetzt laden empfohlen!"
-                    ),
-                    "notify": True,
-                }
-            )
-
-        # Notfall: Auto-SOC kritisch niedrig
-        if s["car_connected"] and s["car_soc"] < cfg.get("car_min_soc_target", DEFAULT_CONFIG["car_min_soc_target"]):
-            decisions.append(
-                {
-                    "action": "car_charge_emergency",
-                    "priority": 0,  # Höchste Priorität
-                    "reason": "Kritischer Auto-SOC",
-                    "details": (
-                        f"Auto-Akku kritisch niedrig: {s['car_soc']:.0f}%!\n"
-                        f"Sofortiges Laden empfohlen (Mindest-SOC: {cfg.get('car_min_soc_target', DEFAULT_CONFIG['car_min_soc_target'])}%)"
-                    ),
-                    "notify": True,
-                }
+        car_needs_charge = False
+        if c.car_connected:
+            # Notfall: Auto-SOC kritisch niedrig
+            if c.car_critical:
+                emergency.append(
+                    Decision(
+                        priority=0,  # Höchste Priorität
+                        action="car_charge_emergency",
+                        reason="Kritischer Auto-SOC",
+                        details=(
+                            "Auto-Akku kritisch niedrig: {:.0f}%!\nSofortiges Laden empfohlen (Mindest-SOC: {}%)",
+                            (car_soc, self._car_min_soc),
+                        ),
+                        notify=True,
+                    )
+                )
+
+            # Auto laden mit PV-Überschuss?
+            car_needs_charge = c.car_needs_charge
+            if car_needs_charge and c.pv_enough_for_car:
+                prio1.append(
+                    Decision(
+                        priority=1,
+                        action="car_charge_pv",
+                        reason="PV-Überschuss",
+                        details=(
+                            "PV-Überschuss: {:.1f} kW verfügbar.\nAuto-Akku: {:.0f}% → Laden empfohlen!",
+                            (pv_surplus_kw, car_soc),
+                        ),
+                        notify=True,
+                    )
+                )
+
+        # Akku laden mit PV-Überschuss (wenn noch nicht voll)? Nur ohne Auto – das Auto hat Vorrang
+        elif c.pv_enough_for_battery and c.battery_has_room:
+            prio1.append(
+                Decision(
+                    priority=1,
+                    action="battery_charge_pv",
+                    reason="PV-Überschuss für Speicher",
+                    details=None,  # Stille Aktion, kein Notify nötig
+                    notify=False,
+                )
             )
 
         # ──────────────────────────────
-        # STOP-Empfehlungen (Kosten sparen)
+        # PREISREGELN: KOSTENMINIMIERUNG / STOP-Empfehlungen
+        # Im Normalfall (Preis zwischen günstig und teuer) greift keine davon
         # ──────────────────────────────
 
-        # Laden stoppen wenn Strom teuer?
-        if price >= expensive and s["battery_soc"] > cfg.get("battery_reserve_evening", DEFAULT_CONFIG["battery_reserve_evening"]):
-            decisions.append(
-                {
-                    "action": "stop_grid_consumption",
-                    "priority": 2,
-                    "reason": "Hoher Strompreis",
-                    "details": (
-                        f"Strom teuer: {price:.3f} €/kWh\n"
-                        f"Speicher ({s['battery_soc']:.0f}%) statt Netzbezug nutzen empfohlen."
-                    ),
-                    "notify": True,
-                }
-            )
-
-        # Nach Priorität sortieren
-        decisions.sort(key=lambda d: d["priority"])
-        return decisions
+        if price_very_cheap or price_cheap or price_expensive:
+            # Speicher aus Netz laden wenn Strom sehr günstig?
+            # PV-Prüfung zuletzt: nur relevant, wenn der Preis überhaupt passt
+            if price_very_cheap and c.battery_has_room and c.pv_weak:
+                prio2.append(
+                    Decision(
+                        priority=2,
+                        action="battery_charge_grid",
+                        reason="Sehr günstiger Netzstrom",
+                        details=(
+                            "Strompreis sehr günstig: {:.3f} €/kWh\nSpeicher ({:.0f}%) aus dem Netz laden empfohlen!",
+                            (price, battery_soc),
+                        ),
+                        notify=True,
+                    )
+                )
+
+            # Auto laden weil Strom günstig (auch ohne PV)?
+            if car_needs_charge and price_cheap and not c.pv_enough_for_car:
+                prio2.append(
+                    Decision(
+                        priority=2,
+                        action="car_charge_cheap",
+                        reason="Günstiger Netzstrom",
+                        details=(
+                            "Günstiger Strom: {:.3f} €/kWh\nAuto-Akku: {:.0f}% → Jetzt laden empfohlen!",
+                            (price, car_soc),
+                        ),
+                        notify=True,
+                    )
+                )
+
+            # Laden stoppen wenn Strom teuer?
+            if price_expensive and c.battery_above_reserve:
+                prio2.append(
+                    Decision(
+                        priority=2,
+                        action="stop_grid_consumption",
+                        reason="Hoher Strompreis",
+                        details=(
+                            "Strom teuer: {:.3f} €/kWh\nSpeicher ({:.0f}%) statt Netzbezug nutzen empfohlen.",
+                            (price, battery_soc),
+                        ),
+                        notify=True,
+                    )
+                )
+
+        return emergency + prio1 + prio2
 
     # ─────────────────────────────────────────────
     # AKTIONEN AUSFÜHREN
     # ─────────────────────────────────────────────
 
-    async def _execute_decisions(self, decisions: list[dict], system: dict):  # pyright: ignore[reportUnusedParameter]
-        """Führt Entscheidungen aus – vorerst nur Benachrichtigungen."""
+    async def _execute_decisions(self, decisions: list[Decision], system: SystemState) -> bool:  # pyright: ignore[reportUnusedParameter]
+        """Führt Entscheidungen aus – vorerst nur Benachrichtigungen. False bei Fehler."""
         if not decisions:
             _LOGGER.info("Keine besonderen Maßnahmen nötig.")
-            return
+            return True
 
+        notifications = []
         for decision in decisions:
-            action = decision["action"]
-            _LOGGER.info("Entscheidung: %s – %s", action, decision["reason"])
+            action = decision.action
+            _LOGGER.info("Entscheidung: %s – %s", action, decision.reason)
+
+            if decision.notify and decision.details:
+                notifications.append((action, decision.details))
 
-            if decision.get("notify") and decision.get("details"):
-                await self._send_smart_notification(action, decision["details"])
+        if notifications:
+            return await self._send_smart_notification(notifications)
+        return True
 
-    async def _send_smart_notification(self, action_key: str, message: str):
+    async def _send_smart_notification(self, notifications: list[tuple[str, tuple[str, tuple]]]) -> bool:
         """
         Sendet Benachrichtigungen mit Cooldown-Schutz.
         Gleiche Nachricht wird max. alle 2 Stunden gesendet.
+        Alle nicht gedrosselten Nachrichten eines Durchlaufs gehen gebündelt
+        in einem Service-Call raus; Texte werden erst danach formatiert.
+        Gibt False zurück, wenn der Service-Call fehlgeschlagen ist.
         """
-        now = datetime.now()
-        last = self._last_notification.get(action_key)
+        # Monotone Uhr: unabhängig von Zeitumstellung/NTP-Korrekturen
+        now = time.monotonic()
+        due = []
+        for action_key, details in notifications:
+            last = self._last_notification.get(action_key)
+            if last is not None and (now - last) < _NOTIFY_COOLDOWN_S:
+                _LOGGER.debug("Benachrichtigung '%s' gedrosselt (Cooldown)", action_key)
+                continue
+            due.append((action_key, details))
 
-        if last and (now - last) < timedelta(hours=2):
-            _LOGGER.debug("Benachrichtigung '%s' gedrosselt (Cooldown)", action_key)
-            return
+        if not due:
+            return True
 
-        try:
-            notify_service = self._cfg.get("notify_service", DEFAULT_CONFIG["notify_service"])
-            parts = notify_service.split(".", 1)
-            domain = parts[0]
-            service = parts[1] if len(parts) > 1 else parts[0]
+        message = "\n\n".join(template.format(*args) for _, (template, args) in due)
 
+        try:
             await self.hass.services.async_call(
-                domain,
-                service,
-                {"message": message, "title": "Energiemanager"},
+                self._notify_domain,
+                self._notify_service,
+                {"message": message, "title": _NOTIFY_TITLE},
             )
-            self._last_notification[action_key] = now
-            _LOGGER.info("Benachrichtigung gesendet: %s", action_key)
+            for action_key, _ in due:
+                self._last_notification[action_key] = now
+            _LOGGER.info("Benachrichtigung gesendet: %s", ", ".join(key for key, _ in due))
         except Exception as ex:
             _LOGGER.error("Benachrichtigungsfehler: %s", ex)
+            return False
+        return True
+
+    def _next_reminder_due(self, decisions: list[Decision]) -> float | None:
+        """Frühester Zeitpunkt (monotonic), zu dem eine aktive Benachrichtigung erneut fällig wird."""
+        return min(
+            (
+                self._last_notification[d.action] + _NOTIFY_COOLDOWN_S
+                for d in decisions
+                if d.notify and d.details and d.action in self._last_notification
+            ),
+            default=None,
+        )
 
     # ─────────────────────────────────────────────
     # HILFSFUNKTIONEN
     # ─────────────────────────────────────────────
 
+    def _input_conditions(
+        self,
+        car_connected: bool,
+        car_soc: float,
+        battery_soc: float,
+        pv_power_kw: float,
+        pv_surplus_kw: float,
+    ) -> RuleConditions:
+        """Wertet die Schwellen der Auto-/Speicher-/PV-Regeln aus."""
+        return RuleConditions(
+            car_connected,
+            car_soc < self._car_target_soc,
+            car_soc < self._car_min_soc,
+            battery_soc < self._battery_max_soc,
+            battery_soc > self._battery_reserve_soc,
+            pv_surplus_kw >= self._pv_surplus_car_kw,
+            pv_surplus_kw >= self._pv_surplus_battery_kw,
+            pv_power_kw <= self._pv_good_threshold_kw,
+        )
+
+    def _price_conditions(self, price: float) -> tuple[bool, bool, bool]:
+        """Preisschwellen der Regeln: (sehr günstig, günstig, teuer)."""
+        return price <= self._very_cheap, price <= self._cheap, price >= self._expensive
+
+    def _state_key(self, s: SystemState) -> tuple:
+        """
+        Alle Teilbedingungen, die _make_decisions auswertet.
+        Gleicher Schlüssel → gleiche Entscheidungen; Schwellenübergänge ändern ihn immer.
+        """
+        conditions = self._input_conditions(
+            s.car_connected, s.car_soc, s.battery_soc, s.pv_power_kw, s.pv_surplus_kw
+        )
+        return (*conditions, *self._price_conditions(s.current_price_eur))
+
+    def _input_band(self) -> RuleConditions:
+        """
+        Lage der Eingangssensoren (ohne Preis) relativ zu den Regelschwellen.
+        Gleiche Umrechnung wie _get_system_state, damit Band und Entscheidung übereinstimmen.
+        """
+        st = self._read_states(_TRIGGER_ENTITY_KEYS)
+        snap = _read_snapshot(st, _BAND_SPEC)
+        return self._input_conditions(
+            _safe_bool(st["car_connected"]),
+            snap["car_soc"],
+            snap["battery_soc"],
+            snap["pv_power_kw"],
+            _pv_surplus_kw(snap),
+        )
+
     def _compute_price_level(self, price: float) -> str:
         """Berechnet Preisniveau anhand der konfigurierten Schwellenwerte (€/kWh)."""
-        cfg = self._cfg
-        very_cheap = cfg.get("price_very_cheap_threshold", DEFAULT_CONFIG["price_very_cheap_threshold"])
-        cheap      = cfg.get("price_cheap_threshold",      DEFAULT_CONFIG["price_cheap_threshold"])
-        expensive  = cfg.get("price_expensive_threshold",  DEFAULT_CONFIG["price_expensive_threshold"])
-
-        if price <= very_cheap:
+        if price <= self._very_cheap:
             return "VERY_CHEAP"
-        if price <= cheap:
+        if price <= self._cheap:
             return "CHEAP"
-        if price >= expensive:
+        if price >= self._expensive:
             return "EXPENSIVE"
         return "NORMAL"
 
-    def _is_pv_producing_well(self, s: dict) -> bool:
-        """Prüft ob PV gerade gut produziert."""
-        return s["pv_power_kw"] > (self._cfg.get("pv_peak_power_kw", DEFAULT_CONFIG["pv_peak_power_kw"]) * 0.2)
-
-    def _safe_float(self, entity_id: str, default: float = 0.0) -> float:
-        """Liest einen HA-Entitätswert als float (sicher, auch bei unavailable)."""
-        state = self.hass.states.get(entity_id)
-        if state is None:
-            return default
-        val = state.state
-        if val in ("unavailable", "unknown", None):
-            return default
-        try:
-            return float(val)
-        except (ValueError, TypeError):
-            return default
-
-    def _safe_bool(self, entity_id: str) -> bool:
-        """Liest einen HA-Entitätswert als bool."""
-        state = self.hass.states.get(entity_id)
-        if state is None:
-            return False
-        return state.state in ("on", "true", "True", "1", "home")
-
-    def _log_system_state(self, s: dict):
+    def _log_system_state(self, s: SystemState):
         """Gibt aktuellen Systemzustand ins Log aus."""
+        if not _LOGGER.isEnabledFor(logging.INFO):
+            return
         _LOGGER.info(
             "System | PV: %.1fkW (Überschuss: %.1fkW) | Akku: %.0f%% | Auto: %.0f%% (%s) | Preis: %.3f€/kWh (%s)",
-            s["pv_power_kw"],
-            s["pv_surplus_kw"],
-            s["battery_soc"],
-            s["car_soc"],
-            "verbunden" if s["car_connected"] else "getrennt",
-            s["current_price_eur"],
-            s["price_level"],
+            s.pv_power_kw,
+            s.pv_surplus_kw,
+            s.battery_soc,
+            s.car_soc,
+            "verbunden" if s.car_connected else "getrennt",
+            s.current_price_eur,
+            s.price_level,
         )
 
+    async def _async_deploy_dashboard(self):
+        """Dashboard-Deploy im Thread-Pool (blocking I/O); Fehler nur loggen."""
+        try:
+            await self.hass.async_add_executor_job(self._deploy_dashboard)
+        except Exception as ex:
+            _LOGGER.error("Fehler beim Dashboard-Deploy: %s", ex)
+
     def _deploy_dashboard(self):
         """Kopiert Dashboard-Dateien nach /config/www/energy_manager/ (sync, im Executor)."""
+        import shutil  # nur beim Deploy benötigt
+
         src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dashboard")
         dest_dir = "/config/www/energy_manager"
 
@@ -477,38 +701,78 @@ class EnergyManagerCoordinator(DataUpdateCoordinator):
             _LOGGER.debug("Dashboard-Quelldateien nicht gefunden, überspringe Deploy")
             return
 
+        with os.scandir(src_dir) as it:
+            src_entries = [entry for entry in it if entry.is_file()]
+        if not src_entries:
+            _LOGGER.debug("Keine Dashboard-Quelldateien vorhanden, überspringe Deploy")
+            return
+
+        # Manifest über Quelldateien + Entitäts-Konfiguration: unverändert → kompletter Deploy entfällt
+        digest = hashlib.sha1(json.dumps(self._entities, sort_keys=True).encode("utf-8"))
+        for entry in sorted(src_entries, key=lambda e: e.name):
+            st = entry.stat()
+            digest.update(f"{entry.name}:{st.st_mtime_ns}:{st.st_size}\n".encode("utf-8"))
+        manifest = digest.hexdigest()
+        manifest_file = os.path.join(dest_dir, ".manifest")
+
         os.makedirs(dest_dir, exist_ok=True)
 
-        for filename in os.listdir(src_dir):
-            src_file = os.path.join(src_dir, filename)
+        # Ziel-mtimes in einem Verzeichnisdurchlauf einsammeln statt exists()/getmtime() pro Datei
+        with os.scandir(dest_dir) as it:
+            dest_mtimes = {entry.name: entry.stat().st_mtime for entry in it if entry.is_file()}
+
+        # Überspringen nur, wenn das Manifest passt und keine Zieldatei gelöscht wurde
+        if "ha_entities.js" in dest_mtimes and all(entry.name in dest_mtimes for entry in src_entries):
+            try:
+                with open(manifest_file, encoding="utf-8") as f:
+                    if f.read().strip() == manifest:
+                        _LOGGER.debug("Dashboard unverändert (Manifest %s), überspringe Deploy", manifest[:8])
+                        return
+            except OSError:
+                pass
+
+        for entry in src_entries:
+            filename = entry.name
             dest_file = os.path.join(dest_dir, filename)
 
-            if not os.path.isfile(src_file):
-                continue
-
             if filename.endswith(".html"):
-                # HTML immer neu schreiben und Cache-Buster in Script-Tags injizieren,
-                # damit der HA Service Worker nie eine veraltete JS-Version ausliefert
-                with open(src_file, encoding="utf-8") as f:
+                # HTML bei jedem Deploy (d. h. nach Änderungen) neu schreiben und Cache-Buster
+                # in Script-Tags injizieren, damit der HA Service Worker keine veraltete JS-Version ausliefert
+                with open(entry.path, "rb") as f:
                     content = f.read()
                 ts = int(datetime.now().timestamp())
-                content = re.sub(r'(src="[^"]+\.js)(?:\?v=\d+)?"', rf'\1?v={ts}"', content)
-                with open(dest_file, "w", encoding="utf-8") as f:
+                content = _SCRIPT_SRC_RE.sub(rb'\1?v=%d"' % ts, content)
+                with open(dest_file, "wb") as f:
                     f.write(content)
                 _LOGGER.info("Dashboard HTML deployed mit Cache-Buster v=%d", ts)
-            elif not os.path.exists(dest_file) or os.path.getmtime(src_file) > os.path.getmtime(dest_file):
-                shutil.copy2(src_file, dest_file)
+                continue
+
+            dest_mtime = dest_mtimes.get(filename)
+            if dest_mtime is None or entry.stat().st_mtime > dest_mtime:
+                shutil.copy2(entry.path, dest_file)
                 _LOGGER.info("Dashboard-Datei kopiert: %s", filename)
 
         # Entitäts-Konfiguration als JS-Datei generieren
         entities_js = (
             "// Automatisch generiert von Energy Manager – nicht manuell bearbeiten\n"
-            f"const HA_ENTITIES = {json.dumps(self._entities, indent=2)};\n"
+            f"const HA_ENTITIES = {json.dumps(self._entities, separators=(',', ':'))};\n"
         )
         entities_dest = os.path.join(dest_dir, "ha_entities.js")
-        with open(entities_dest, "w") as f:
-            f.write(entities_js)
-        _LOGGER.info("Entitäts-Konfiguration nach ha_entities.js geschrieben")
+        try:
+            with open(entities_dest, encoding="utf-8") as f:
+                entities_unchanged = f.read() == entities_js
+        except OSError:
+            entities_unchanged = False
+        if not entities_unchanged:
+            with open(entities_dest, "w", encoding="utf-8") as f:
+                f.write(entities_js)
+            _LOGGER.info("Entitäts-Konfiguration nach ha_entities.js geschrieben")
+
+        # Manifest erst nach erfolgreichem Deploy atomar schreiben
+        tmp_file = f"{manifest_file}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(manifest)
+        os.replace(tmp_file, manifest_file)
 
         _LOGGER.info("Dashboard verfügbar unter /local/energy_manager/energy_manager_dashboard.html")
 
@@ -524,16 +788,54 @@ class EnergyManagerCoordinator(DataUpdateCoordinator):
         new_val = new_state.state
         old_val = old_state.state if old_state else None
 
-        if new_val == old_val:
+        # Identisch oder (noch) kein Preis → nichts zu parsen
+        if new_val == old_val or new_val in _UNAVAILABLE:
             return
 
         try:
             new_price = float(new_val)
-            old_price = float(old_val) if old_val not in (None, "unavailable", "unknown") else None
-
-            # Nur reagieren wenn sich Preis signifikant ändert (> 2 Ct)
-            if old_price is not None and abs(new_price - old_price) > 0.02:
-                _LOGGER.info("Preisänderung: %.3f → %.3f €/kWh", old_price, new_price)
-                self.hass.async_create_task(self.async_refresh())
-        except (ValueError, TypeError):
-            pass
+        except ValueError:
+            return
+
+        # Referenz ist der zuletzt verarbeitete Preis – so lösen Retransmits und
+        # Hin-und-her-Sprünge um denselben Wert keinen weiteren Durchlauf aus
+        ref_price = self._last_price_processed
+        if ref_price is None:
+            if old_val in _UNAVAILABLE:
+                return
+            try:
+                ref_price = float(old_val)
+            except ValueError:
+                return
+
+        # Nur reagieren wenn sich Preis signifikant ändert (> 2 Ct) oder eine
+        # Preisschwelle der Regeln überschreitet (auch bei kleiner Änderung)
+        if (
+            abs(new_price - ref_price) > _PRICE_CHANGE_THRESHOLD_EUR
+            or self._compute_price_level(new_price) != self._compute_price_level(ref_price)
+        ):
+            _LOGGER.info("Preisänderung: %.3f → %.3f €/kWh", ref_price, new_price)
+            self._last_price_processed = new_price
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _on_sensor_change(self, event) -> None:
+        """Reagiert auf Schwellenübergänge der Eingangssensoren (synchroner Callback)."""
+        new_state = event.data.get("new_state")
+        old_state = event.data.get("old_state")
+
+        if new_state is None or old_state is None:
+            return
+
+        # Reine Attribut-Updates ändern keinen Eingangswert
+        if new_state.state == old_state.state:
+            return
+
+        # PV-Leistung und Hausverbrauch ändern sich laufend – nur Schwellenübergänge
+        # (auch des Überschusses aus beiden) sind für die Regeln relevant
+        band = self._input_band()
+        if band == self._last_input_band:
+            return
+        self._last_input_band = band
+
+        self.hass.async_create_task(self.async_request_refresh())
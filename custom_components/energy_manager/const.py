@@ -1,5 +1,7 @@
 """Konstanten für den Energy Manager."""
 
+from dataclasses import dataclass, fields
+
 DOMAIN = "energy_manager"
 
 DEFAULT_CONFIG = {
@@ -64,5 +66,88 @@ DEFAULT_CONFIG = {
 
     # Benachrichtigungen
     "notify_service": "notify.mobile_app_dein_smartphone",
-    "check_interval_minutes": 15,
+    "check_interval_minutes": 60,  # Sicherheitsnetz – Auslöser sind Zustandsänderungen
 }
+
+
+@dataclass(frozen=True, slots=True)
+class EnergyManagerConfig:
+    """Aufgelöste Konfiguration (DEFAULT_CONFIG + configuration.yaml) mit Attributzugriff."""
+
+    # Hausakku
+    battery_capacity_kwh: float
+    battery_min_soc: int
+    battery_max_soc: int
+    battery_reserve_evening: int
+
+    # Elektroauto
+    car_battery_capacity_kwh: float
+    car_max_charge_power_kw: float
+    car_min_soc_target: int
+    car_default_target_soc: int
+
+    # PV-Anlage
+    pv_peak_power_kw: float
+
+    # Strompreise (€/kWh)
+    price_cheap_threshold: float
+    price_very_cheap_threshold: float
+    price_expensive_threshold: float
+
+    # PV-Schwellenwerte (kW)
+    pv_surplus_for_car_charging: float
+    pv_surplus_for_battery: float
+
+    entities: dict[str, str]
+    notify_service: str
+    check_interval_minutes: int
+
+    @classmethod
+    def from_dict(cls, cfg: dict) -> "EnergyManagerConfig":
+        """Ergänzt fehlende Werte aus DEFAULT_CONFIG; unbekannte Schlüssel werden ignoriert."""
+        merged = {**DEFAULT_CONFIG, **cfg}
+        return cls(**{f.name: merged[f.name] for f in fields(cls)})
+
+
+@dataclass(frozen=True, slots=True)
+class SystemState:
+    """Momentaufnahme aller Sensordaten eines Durchlaufs (Einheiten im Feldnamen).
+
+    Unveränderlich und per Wert vergleichbar – der Koordinator (always_update=False)
+    erkennt damit unveränderte Durchläufe.
+    """
+
+    # PV
+    pv_power_kw: float
+    pv_surplus_kw: float
+    pv_forecast_today_kwh: float
+    pv_forecast_remaining_kwh: float
+    pv_forecast_tomorrow_kwh: float
+    pv_forecast_next_hour_kwh: float
+    pv_forecast_d3_kwh: float
+    pv_forecast_d4_kwh: float
+    pv_forecast_d5_kwh: float
+    pv_forecast_d6_kwh: float
+    pv_forecast_d7_kwh: float
+
+    # Hausakku
+    battery_soc: float
+    battery_power_kw: float
+
+    # Elektroauto
+    car_soc: float
+    car_connected: bool
+    car_charging_power_kw: float
+
+    # Netz & Verbrauch
+    grid_power_kw: float
+    house_consumption_kw: float
+
+    # Preise
+    current_price_eur: float
+    price_level: str
+
+    # Zeit
+    hour: int
+    is_night: bool
+    is_morning: bool
@@ -56,28 +56,46 @@ UNIT_DIVISORS = {
     "car_charging_power": 1000,  # ← ändere auf 1 wenn Sensor kW liefert
 }
 
+# Leistungssensoren in fester Reihenfolge mit ihrem Teiler – einmal beim Laden aufgelöst
+_POWER_SPEC = tuple((key, UNIT_DIVISORS[key]) for key in (
+    "pv_power", "house_consumption", "grid_power", "battery_power", "car_charging_power",
+))
+
 
 # ─────────────────────────────────────────────
 # Hilfsfunktionen (aus __init__.py extrahiert)
 # ─────────────────────────────────────────────
 
+def resolve_cfg(cfg: dict) -> dict:
+    """Mischt cfg einmalig mit DEFAULT_CONFIG (analog async_setup)."""
+    entities = {**DEFAULT_CONFIG["entities"], **cfg.get("entities", {})}
+    return {**DEFAULT_CONFIG, **cfg, "entities": entities}
+
+
 def compute_price_level(price: float, cfg: dict) -> str:
-    """Berechnet Preisniveau anhand der konfigurierten Schwellenwerte (€/kWh)."""
-    very_cheap = cfg.get("price_very_cheap_threshold", DEFAULT_CONFIG["price_very_cheap_threshold"])
-    cheap      = cfg.get("price_cheap_threshold",      DEFAULT_CONFIG["price_cheap_threshold"])
-    expensive  = cfg.get("price_expensive_threshold",  DEFAULT_CONFIG["price_expensive_threshold"])
-    if price <= very_cheap:
+    """Berechnet Preisniveau anhand der Schwellenwerte (€/kWh); cfg aus resolve_cfg()."""
+    if price <= cfg["price_very_cheap_threshold"]:
         return "VERY_CHEAP"
-    if price <= cheap:
+    if price <= cfg["price_cheap_threshold"]:
         return "CHEAP"
-    if price >= expensive:
+    if price >= cfg["price_expensive_threshold"]:
         return "EXPENSIVE"
     return "NORMAL"
 
 
+# Zustandswerte für safe_float / safe_bool (analog __init__.py)
+_UNAVAILABLE = frozenset({"unavailable", "unknown", None})
+_TRUTHY = frozenset({"on", "true", "True", "1", "home"})
+
+
 def safe_float(entity_id: str, default: float = 0.0) -> float:
     val = MOCK_SENSORS.get(entity_id, default)
-    if val in ("unavailable", "unknown", None):
+    # Mock-Werte sind meist schon Zahlen – dann entfällt jede weitere Prüfung
+    if type(val) is float:
+        return val
+    if type(val) is int:
+        return float(val)
+    if val in _UNAVAILABLE:
         return default
     try:
         return float(val)
@@ -87,7 +105,7 @@ def safe_float(entity_id: str, default: float = 0.0) -> float:
 
 def safe_bool(entity_id: str) -> bool:
     val = MOCK_SENSORS.get(entity_id, "off")
-    return str(val) in ("on", "true", "True", "1", "home")
+    return str(val) in _TRUTHY
 
 
 # ─────────────────────────────────────────────
@@ -97,19 +115,11 @@ def safe_bool(entity_id: str) -> bool:
 def get_system_state(cfg: dict) -> dict:
     e = cfg["entities"]
 
-    pv_power_raw        = safe_float(e["pv_power"])
-    house_consumption_raw = safe_float(e["house_consumption"])
-    grid_power_raw      = safe_float(e["grid_power"])
-    battery_power_raw   = safe_float(e["battery_power"])
-    car_charging_raw    = safe_float(e["car_charging_power"])
-
-    # Einheitenumrechnung
-    pv_power_kw         = pv_power_raw        / UNIT_DIVISORS["pv_power"]
-    house_consumption_kw = house_consumption_raw / UNIT_DIVISORS["house_consumption"]
-    grid_power_kw       = grid_power_raw       / UNIT_DIVISORS["grid_power"]
-    battery_power_kw    = battery_power_raw    / UNIT_DIVISORS["battery_power"]
-    car_charging_kw     = car_charging_raw     / UNIT_DIVISORS["car_charging_power"]
-    pv_surplus_kw       = pv_power_kw - house_consumption_kw
+    # Leistungen lesen und in einem Durchlauf in kW umrechnen
+    pv_power_kw, house_consumption_kw, grid_power_kw, battery_power_kw, car_charging_kw = [
+        safe_float(e[key]) / div for key, div in _POWER_SPEC
+    ]
+    pv_surplus_kw = pv_power_kw - house_consumption_kw
 
     current_price_eur = safe_float(e["current_price"])
     price_level = compute_price_level(current_price_eur, cfg)
@@ -145,52 +155,62 @@ def get_system_state(cfg: dict) -> dict:
 # Entscheidungslogik (1:1 aus __init__.py)
 # ─────────────────────────────────────────────
 
-def make_decisions(s: dict, cfg: dict) -> list[dict]:
-    decisions = []
-    price    = s["current_price_eur"]
-    cheap      = cfg.get("price_cheap_threshold",      DEFAULT_CONFIG["price_cheap_threshold"])
-    very_cheap = cfg.get("price_very_cheap_threshold", DEFAULT_CONFIG["price_very_cheap_threshold"])
-    expensive  = cfg.get("price_expensive_threshold",  DEFAULT_CONFIG["price_expensive_threshold"])
-
-    if (
-        s["car_connected"]
-        and s["car_soc"] < cfg.get("car_default_target_soc", DEFAULT_CONFIG["car_default_target_soc"])
-        and s["pv_surplus_kw"] >= cfg.get("pv_surplus_for_car_charging", DEFAULT_CONFIG["pv_surplus_for_car_charging"])
-    ):
-        decisions.append({"action": "car_charge_pv", "priority": 1, "reason": "PV-Überschuss"})
-
-    if (
-        s["pv_surplus_kw"] >= cfg.get("pv_surplus_for_battery", DEFAULT_CONFIG["pv_surplus_for_battery"])
-        and s["battery_soc"] < cfg.get("battery_max_soc", DEFAULT_CONFIG["battery_max_soc"])
-        and not s["car_connected"]
-    ):
-        decisions.append({"action": "battery_charge_pv", "priority": 1, "reason": "PV-Überschuss für Speicher"})
-
-    pv_producing_well = s["pv_power_kw"] > (cfg.get("pv_peak_power_kw", DEFAULT_CONFIG["pv_peak_power_kw"]) * 0.2)
-
-    if (
-        price <= very_cheap
-        and s["battery_soc"] < cfg.get("battery_max_soc", DEFAULT_CONFIG["battery_max_soc"])
-        and not pv_producing_well
-    ):
-        decisions.append({"action": "battery_charge_grid", "priority": 2, "reason": "Sehr günstiger Netzstrom"})
-
-    if (
-        s["car_connected"]
-        and s["car_soc"] < cfg.get("car_default_target_soc", DEFAULT_CONFIG["car_default_target_soc"])
-        and price <= cheap
-        and s["pv_surplus_kw"] < cfg.get("pv_surplus_for_car_charging", DEFAULT_CONFIG["pv_surplus_for_car_charging"])
-    ):
-        decisions.append({"action": "car_charge_cheap", "priority": 2, "reason": "Günstiger Netzstrom"})
-
-    if s["car_connected"] and s["car_soc"] < cfg.get("car_min_soc_target", DEFAULT_CONFIG["car_min_soc_target"]):
-        decisions.append({"action": "car_charge_emergency", "priority": 0, "reason": "Kritischer Auto-SOC"})
-
-    if price >= expensive and s["battery_soc"] > cfg.get("battery_reserve_evening", DEFAULT_CONFIG["battery_reserve_evening"]):
-        decisions.append({"action": "stop_grid_consumption", "priority": 2, "reason": "Hoher Strompreis"})
-
-    decisions.sort(key=lambda d: d["priority"])
-    return decisions
+# Mögliche Entscheidungen als feste (action, priority, reason)-Tupel –
+# make_decisions gibt nur Referenzen darauf zurück
+_DEC_CAR_EMERGENCY = ("car_charge_emergency", 0, "Kritischer Auto-SOC")
+_DEC_CAR_PV        = ("car_charge_pv", 1, "PV-Überschuss")
+_DEC_BATTERY_PV    = ("battery_charge_pv", 1, "PV-Überschuss für Speicher")
+_DEC_BATTERY_GRID  = ("battery_charge_grid", 2, "Sehr günstiger Netzstrom")
+_DEC_CAR_CHEAP     = ("car_charge_cheap", 2, "Günstiger Netzstrom")
+_DEC_STOP_GRID     = ("stop_grid_consumption", 2, "Hoher Strompreis")
+
+
+def make_decisions(s: dict, cfg: dict) -> list[tuple[str, int, str]]:
+    # Ein Topf je Priorität (analog __init__.py) – kein Sortieren nötig
+    emergency, prio1, prio2 = [], [], []
+
+    # Schwellenwerte einmal in lokale Variablen übernehmen
+    cheap           = cfg["price_cheap_threshold"]
+    very_cheap      = cfg["price_very_cheap_threshold"]
+    expensive       = cfg["price_expensive_threshold"]
+    target_soc      = cfg["car_default_target_soc"]
+    min_soc         = cfg["car_min_soc_target"]
+    pv_for_car      = cfg["pv_surplus_for_car_charging"]
+    pv_for_battery  = cfg["pv_surplus_for_battery"]
+    battery_max     = cfg["battery_max_soc"]
+    battery_reserve = cfg["battery_reserve_evening"]
+    pv_peak_threshold = cfg["pv_peak_power_kw"] * 0.2
+
+    # Mehrfach gelesene Zustandswerte einmal übernehmen
+    price         = s["current_price_eur"]
+    car_connected = s["car_connected"]
+    car_soc       = s["car_soc"]
+    battery_soc   = s["battery_soc"]
+    pv_surplus_kw = s["pv_surplus_kw"]
+
+    # Auto-Regeln nur bei verbundenem Auto prüfen; ohne Auto bleibt nur der Speicher
+    car_needs_charge = False
+    if car_connected:
+        if car_soc < min_soc:
+            emergency.append(_DEC_CAR_EMERGENCY)
+        car_needs_charge = car_soc < target_soc
+        if car_needs_charge and pv_surplus_kw >= pv_for_car:
+            prio1.append(_DEC_CAR_PV)
+    elif pv_surplus_kw >= pv_for_battery and battery_soc < battery_max:
+        prio1.append(_DEC_BATTERY_PV)
+
+    # Preisregeln: im Normalfall (Preis zwischen günstig und teuer) greift keine davon
+    if price <= max(cheap, very_cheap) or price >= expensive:
+        if price <= very_cheap and battery_soc < battery_max and s["pv_power_kw"] <= pv_peak_threshold:
+            prio2.append(_DEC_BATTERY_GRID)
+
+        if car_needs_charge and price <= cheap and pv_surplus_kw < pv_for_car:
+            prio2.append(_DEC_CAR_CHEAP)
+
+        if price >= expensive and battery_soc > battery_reserve:
+            prio2.append(_DEC_STOP_GRID)
+
+    return emergency + prio1 + prio2
 
 
 # ─────────────────────────────────────────────
@@ -198,27 +218,31 @@ def make_decisions(s: dict, cfg: dict) -> list[dict]:
 # ─────────────────────────────────────────────
 
 def print_state(s: dict):
-    print("\n=== Systemzustand ===")
-    print(f"  PV:          {s['pv_power_kw']:.2f} kW  (Überschuss: {s['pv_surplus_kw']:.2f} kW)")
-    print(f"  Hauslast:    {s['house_consumption_kw']:.2f} kW")
-    print(f"  Netz:        {s['grid_power_kw']:.2f} kW")
-    print(f"  Akku:        {s['battery_soc']:.0f}%  ({s['battery_power_kw']:.2f} kW)")
-    print(f"  Auto:        {s['car_soc']:.0f}%  ({'verbunden' if s['car_connected'] else 'getrennt'})  Ladeleistung: {s['car_charging_power_kw']:.2f} kW")
-    print(f"  Preis:       {s['current_price_eur']:.3f} €/kWh  ({s['price_level']})")
-    print(f"  PV-Prognose: Heute {s['pv_forecast_today_kwh']:.1f} kWh | Rest {s['pv_forecast_remaining_kwh']:.1f} kWh | Morgen {s['pv_forecast_tomorrow_kwh']:.1f} kWh | Nächste Std {s['pv_forecast_next_hour_kwh']:.1f} kWh")
-    print(f"  PV 7-Tage:  D3={s['pv_forecast_d3_kwh']:.1f} D4={s['pv_forecast_d4_kwh']:.1f} D5={s['pv_forecast_d5_kwh']:.1f} D6={s['pv_forecast_d6_kwh']:.1f} D7={s['pv_forecast_d7_kwh']:.1f} kWh")
-
-
-def print_decisions(decisions: list[dict]):
-    print("\n=== Entscheidungen ===")
+    lines = [
+        "\n=== Systemzustand ===",
+        f"  PV:          {s['pv_power_kw']:.2f} kW  (Überschuss: {s['pv_surplus_kw']:.2f} kW)",
+        f"  Hauslast:    {s['house_consumption_kw']:.2f} kW",
+        f"  Netz:        {s['grid_power_kw']:.2f} kW",
+        f"  Akku:        {s['battery_soc']:.0f}%  ({s['battery_power_kw']:.2f} kW)",
+        f"  Auto:        {s['car_soc']:.0f}%  ({'verbunden' if s['car_connected'] else 'getrennt'})  Ladeleistung: {s['car_charging_power_kw']:.2f} kW",
+        f"  Preis:       {s['current_price_eur']:.3f} €/kWh  ({s['price_level']})",
+        f"  PV-Prognose: Heute {s['pv_forecast_today_kwh']:.1f} kWh | Rest {s['pv_forecast_remaining_kwh']:.1f} kWh | Morgen {s['pv_forecast_tomorrow_kwh']:.1f} kWh | Nächste Std {s['pv_forecast_next_hour_kwh']:.1f} kWh",
+        f"  PV 7-Tage:  D3={s['pv_forecast_d3_kwh']:.1f} D4={s['pv_forecast_d4_kwh']:.1f} D5={s['pv_forecast_d5_kwh']:.1f} D6={s['pv_forecast_d6_kwh']:.1f} D7={s['pv_forecast_d7_kwh']:.1f} kWh",
+    ]
+    # Ein einziger Schreibvorgang statt eines print() pro Zeile
+    sys.stdout.write("\n".join(lines) + "\n")
+
+
+def print_decisions(decisions: list[tuple[str, int, str]]):
+    lines = ["\n=== Entscheidungen ==="]
     if not decisions:
-        print("  (keine Maßnahmen nötig)")
-    for d in decisions:
-        print(f"  [{d['priority']}] {d['action']:30s}  ← {d['reason']}")
+        lines.append("  (keine Maßnahmen nötig)")
+    lines += [f"  [{priority}] {action:30s}  ← {reason}" for action, priority, reason in decisions]
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
-    cfg = DEFAULT_CONFIG
+    cfg = resolve_cfg(DEFAULT_CONFIG)
     s = get_system_state(cfg)
     print_state(s)
 